@@ -6,13 +6,57 @@
 支持多种日期格式：YYYYMMDD.md, YYYYMMDD星期五.md等
 """
 
+import functools
+import io
 import os
 import re
 import shutil
-import subprocess
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Iterator, TextIO
+
+# 日志文件名以日期开头：YYYYMMDD
+_DATE_RE = re.compile(r'^(\d{4})(\d{2})(\d{2})')
+# 任务项：- [ ] 或 - [x]
+_TASK_RE = re.compile(r'^\s*-\s*\[([x ])\]\s*(.+)$')
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_from_filename(filename: str) -> Optional[date]:
+    """
+    从文件名中解析日期（结果按文件名缓存）
+
+    支持格式（文件名须以日期开头）：
+    - YYYYMMDD.md (如: 20251107.md)
+    - YYYYMMDD星期五.md (如: 20251107星期五.md)
+    - YYYYMMDD周X.md (如: 20251107周5.md)
+    - YYYYMMDD_其他文字.md
+
+    Args:
+        filename: 文件名
+
+    Returns:
+        解析后的日期，解析失败返回None
+    """
+    # 文件名以 YYYYMMDD 开头，只看前8个字符，无需先去掉 .md 扩展名
+    # 先做廉价的前缀检查，避免无谓的正则匹配
+    if len(filename) < 8 or not filename[:8].isdigit():
+        return None
+
+    match = _DATE_RE.match(filename)
+    if not match:
+        return None
+
+    year, month, day = map(int, match.groups())
+    if not (1 <= month <= 12 and 1 <= day <= 31):
+        return None
+
+    try:
+        return date(year, month, day)
+    except ValueError:
+        # 如 2月30日 这类不存在的日期
+        return None
 
 
 def resolve_claude_path(claude_path=None) -> str:
@@ -56,15 +100,18 @@ def resolve_claude_path(claude_path=None) -> str:
 
 
 class WorklogCollector:
-    def __init__(self, base_path: str):
+    def __init__(self, base_path: str, now: Optional[datetime] = None):
         """
         初始化工作日志收集器
 
         Args:
             base_path: 工作日志根目录路径
+            now: 本次运行的基准时间，默认为当前时间；
+                 所有日期范围与文件名都基于它计算，避免跨午夜时前后不一致
         """
         self.base_path = Path(base_path)
-        self.current_year = datetime.now().year
+        self._now = now or datetime.now()
+        self.current_year = self._now.year
         self.log_files = []
 
     @staticmethod
@@ -94,13 +141,7 @@ class WorklogCollector:
 
     def parse_date_from_filename(self, filename: str) -> Optional[datetime]:
         """
-        从文件名中解析日期
-
-        支持格式：
-        - YYYYMMDD.md (如: 20251107.md)
-        - YYYYMMDD星期五.md (如: 20251107星期五.md)
-        - YYYYMMDD周X.md (如: 20251107周5.md)
-        - YYYYMMDD_其他文字.md
+        从文件名中解析日期，格式说明见 _parse_date_from_filename
 
         Args:
             filename: 文件名
@@ -108,146 +149,200 @@ class WorklogCollector:
         Returns:
             解析后的日期对象，解析失败返回None
         """
-        # 移除.md扩展名
-        name = filename.replace('.md', '')
-
-        # 匹配日期部分：YYYYMMDD
-        date_pattern = r'(\d{4})(\d{2})(\d{2})'
-        match = re.search(date_pattern, name)
-
-        if match:
-            year, month, day = map(int, match.groups())
-            try:
-                return datetime(year, month, day)
-            except ValueError:
-                return None
+        file_date = _parse_date_from_filename(filename)
+        if file_date is None:
+            return None
+        return datetime.combine(file_date, datetime.min.time())
 
-        return None
-
-    def find_recent_logs(self, days: int = 7) -> List[Path]:
+    def _scandir_log_entries(self) -> Iterator[os.DirEntry]:
         """
-        查找过去N天的工作日志文件
-
-        Args:
-            days: 天数，默认为7天
+        遍历当年的 年份/月份 目录，产出其中的 .md 日志文件条目
 
-        Returns:
-            工作日志文件路径列表
+        直接打开当年的年份目录，用 os.scandir 逐层遍历并只做字符串判断，
+        DirEntry 自带目录项类型，is_dir()/is_file() 不跟随软链接时无需额外 stat。
         """
-        # 如果是5天工作日，使用工作周逻辑
-        if days == 5:
-            return self.find_recent_work_week_logs()
-
-        # 其他天数使用原逻辑
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-
-        log_files = []
-
-        # 遍历年份目录
-        for year_dir in self.base_path.iterdir():
-            if not year_dir.is_dir() or year_dir.name != str(self.current_year):
-                continue
+        year_path = os.path.join(self.base_path, str(self.current_year))
+        try:
+            year_it = os.scandir(year_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return
 
-            # 遍历月份目录
-            for month_dir in year_dir.iterdir():
-                if not month_dir.is_dir():
+        with year_it:
+            for month_entry in year_it:
+                name = month_entry.name
+                # 只保留 01-12 的月份目录（隐藏目录等自然被排除）
+                # isdigit() 对 '²' 等字符也为真，需同时要求 ASCII，否则 int() 会抛 ValueError
+                if not (name.isascii() and name.isdigit()) or not 1 <= int(name) <= 12:
                     continue
-
-                # 跳过隐藏目录
-                if month_dir.name.startswith('.'):
+                if not month_entry.is_dir(follow_symlinks=False):
                     continue
 
+                # 遍历日志文件；无权限读取的月份目录直接跳过（与 pathlib glob 行为一致）
                 try:
-                    month_num = int(month_dir.name)
-                    if month_num < 1 or month_num > 12:
-                        continue
-                except ValueError:
+                    month_it = os.scandir(month_entry.path)
+                except PermissionError:
                     continue
 
-                # 遍历日志文件
-                for log_file in month_dir.glob("*.md"):
-                    # 解析文件名中的日期
-                    file_date = self.parse_date_from_filename(log_file.name)
-                    # 只比较日期部分，不比较时间部分
-                    if file_date and file_date.date() >= start_date.date() and file_date.date() <= end_date.date():
-                        log_files.append(log_file)
-
-        return sorted(log_files)
+                with month_it as it:
+                    for entry in it:
+                        # 只要普通文件：排除软链接和名为 *.md 的目录
+                        if entry.name.endswith('.md') and entry.is_file(follow_symlinks=False):
+                            yield entry
 
-    def find_recent_work_week_logs(self) -> List[Path]:
+    @staticmethod
+    def _work_week_bounds(now: datetime) -> Tuple[datetime, datetime]:
         """
-        查找最近的完整工作周（周一到周五）日志文件
+        计算最近的完整工作周（周一到周五）
+
+        Args:
+            now: 基准时间
 
         Returns:
-            工作日志文件路径列表
+            tuple: (周一, 周五)
         """
-        today = datetime.now()
         # 计算今天是周几 (0=周一, 6=周日)
-        today_weekday = today.weekday()
+        today_weekday = now.weekday()
 
         # 如果今天是周一到周四，取上周一到上周五
         if today_weekday in [0, 1, 2, 3]:
             # 上周的周一
-            days_since_monday = today_weekday
-            last_monday = today - timedelta(days=days_since_monday + 7)
+            last_monday = now - timedelta(days=today_weekday + 7)
         else:  # 周五、周六、周日 (4, 5, 6)
             # 本周的周一
-            days_since_monday = today_weekday
-            last_monday = today - timedelta(days=days_since_monday)
+            last_monday = now - timedelta(days=today_weekday)
 
         # 工作周是周一到周五
-        start_date = last_monday
-        end_date = last_monday + timedelta(days=4)  # 周五
+        return last_monday, last_monday + timedelta(days=4)
 
-        log_files = []
+    def _compute_range(self, days: int) -> Tuple[datetime, datetime, str]:
+        """
+        计算统计的日期范围
 
-        # 遍历年份目录
-        for year_dir in self.base_path.iterdir():
-            if not year_dir.is_dir() or year_dir.name != str(self.current_year):
-                continue
+        Args:
+            days: 天数，5天时使用最近的完整工作周（周一到周五）
 
-            # 遍历月份目录
-            for month_dir in year_dir.iterdir():
-                if not month_dir.is_dir():
-                    continue
+        Returns:
+            tuple: (开始日期, 结束日期, 统计范围描述)
+        """
+        if days == 5:
+            last_monday, week_end = self._work_week_bounds(self._now)
+            label = f"工作周：{self._format_date_range(last_monday, week_end)}"
+            return last_monday, week_end, label
 
-                # 跳过隐藏目录
-                if month_dir.name.startswith('.'):
-                    continue
+        end_date = self._now
+        start_date = end_date - timedelta(days=days)
+        return start_date, end_date, f"过去 {days} 天"
 
-                try:
-                    month_num = int(month_dir.name)
-                    if month_num < 1 or month_num > 12:
-                        continue
-                except ValueError:
-                    continue
+    @staticmethod
+    def _format_date_range(start_date: datetime, end_date: datetime) -> str:
+        return f"{start_date.strftime('%Y-%m-%d')} 至 {end_date.strftime('%Y-%m-%d')}"
+
+    def date_range_text(self, days: int) -> str:
+        """
+        获取统计日期范围的文字描述
+
+        Args:
+            days: 天数，5天时为最近的完整工作周
+
+        Returns:
+            形如 "YYYY-MM-DD 至 YYYY-MM-DD" 的日期范围
+        """
+        start_date, end_date, _ = self._compute_range(days)
+        return self._format_date_range(start_date, end_date)
+
+    def _iter_log_files(self, start_date: datetime, end_date: datetime) -> Iterator[Tuple[os.DirEntry, date]]:
+        """
+        遍历一次目录，产出日期落在 [start_date, end_date] 内的日志文件条目及其日期
+
+        Args:
+            start_date: 开始日期（含）
+            end_date: 结束日期（含）
+        """
+        # 只比较日期部分，不比较时间部分
+        start_day = start_date.date()
+        end_day = end_date.date()
+
+        for entry in self._scandir_log_entries():
+            # 解析文件名中的日期
+            file_date = _parse_date_from_filename(entry.name)
+            if file_date and start_day <= file_date <= end_day:
+                yield entry, file_date
+
+    def find_recent_logs(self, days: int = 7) -> List[Path]:
+        """
+        查找过去N天的工作日志文件
+
+        Args:
+            days: 天数，默认为7天；5天时使用工作周逻辑
+
+        Returns:
+            工作日志文件路径列表
+        """
+        return [log_file for log_file, _ in self._find_log_files(days)]
 
-                # 遍历日志文件
-                for log_file in month_dir.glob("*.md"):
-                    # 解析文件名中的日期
-                    file_date = self.parse_date_from_filename(log_file.name)
-                    # 只比较日期部分，不比较时间部分
-                    if file_date and file_date.date() >= start_date.date() and file_date.date() <= end_date.date():
-                        log_files.append(log_file)
+    def _find_log_files(self, days: int) -> List[Tuple[Path, date]]:
+        """
+        查找过去N天的工作日志文件，连同遍历时已解析出的日期一起返回
 
-        return sorted(log_files)
+        Args:
+            days: 天数
+
+        Returns:
+            (日志文件路径, 日期) 列表
+        """
+        start_date, end_date, _ = self._compute_range(days)
+        # 文件名以日期开头，按文件名排序即按日期排序；
+        # 比较字符串而不是 Path，且只为最终结果构造 Path
+        matches = sorted(self._iter_log_files(start_date, end_date), key=lambda m: m[0].name)
+        return [(Path(entry.path), file_date) for entry, file_date in matches]
+
+    def find_recent_work_week_logs(self) -> List[Path]:
+        """
+        查找最近的完整工作周（周一到周五）日志文件
+
+        Returns:
+            工作日志文件路径列表
+        """
+        return self.find_recent_logs(5)
 
-    def parse_log_file(self, file_path: Path) -> Dict:
+    def parse_log_file(self, file_path: Path, file_date: Optional[date] = None) -> Dict:
         """
         解析单个工作日志文件
 
         Args:
             file_path: 日志文件路径
+            file_date: 遍历目录时已解析出的日期；为None时从文件名解析
 
         Returns:
             解析后的日志内容字典
         """
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        return self._parse_log_content(file_path, self._read_log_file(file_path), file_date)
 
+    @staticmethod
+    def _read_log_file(file_path: Path) -> str:
+        # 二进制读取后一次性解码，省去文本模式的增量解码开销
+        with open(file_path, 'rb') as f:
+            content = f.read().decode('utf-8')
+        # 保持与文本模式一致的换行处理
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+
+    def _parse_log_content(self, file_path: Path, content: str, file_date: Optional[date] = None) -> Dict:
+        """
+        解析已读入的工作日志内容
+
+        Args:
+            file_path: 日志文件路径
+            content: 日志文件内容
+            file_date: 遍历目录时已解析出的日期；为None时从文件名解析
+
+        Returns:
+            解析后的日志内容字典
+        """
         # 提取日期
-        file_date = self.parse_date_from_filename(file_path.name)
+        if file_date is None:
+            file_date = _parse_date_from_filename(file_path.name)
         if file_date:
             date_str = file_date.strftime('%Y-%m-%d')
         else:
@@ -263,29 +358,12 @@ class WorklogCollector:
         section_tasks: Dict[str, Dict[str, List[str]]] = {}
         current_section_title = "未分类"
 
-        # 匹配任务项 [-] 或 [x]
-        task_pattern = r'^\s*-\s*\[([x ])\]\s*(.+)$'
-        for line in content.split('\n'):
-            if line.startswith('##'):
-                current_section_title = line.lstrip('#').strip() or "未分类"
-
-            match = re.match(task_pattern, line, re.MULTILINE)
-            if match:
-                status, task = match.groups()
-                task = task.strip()
-                section_tasks.setdefault(current_section_title, {'completed': [], 'pending': []})
-                if status.lower() == 'x':
-                    tasks['completed'].append(task)
-                    section_tasks[current_section_title]['completed'].append(task)
-                else:
-                    tasks['pending'].append(task)
-                    section_tasks[current_section_title]['pending'].append(task)
-
         # 提取引用内容（以> 开头或## 开头的部分）
         sections = []
         current_section = None
         current_content = []
 
+        # 单次遍历：同时处理章节边界与任务项
         for line in content.split('\n'):
             if line.startswith('##'):
                 if current_section:
@@ -295,8 +373,23 @@ class WorklogCollector:
                     })
                 current_section = line.lstrip('#').strip()
                 current_content = []
-            else:
-                current_content.append(line)
+                current_section_title = current_section or "未分类"
+                continue
+
+            current_content.append(line)
+
+            # 匹配任务项 [-] 或 [x]
+            match = _TASK_RE.match(line)
+            if match:
+                status, task = match.groups()
+                task = task.strip()
+                section_tasks.setdefault(current_section_title, {'completed': [], 'pending': []})
+                if status.lower() == 'x':
+                    tasks['completed'].append(task)
+                    section_tasks[current_section_title]['completed'].append(task)
+                else:
+                    tasks['pending'].append(task)
+                    section_tasks[current_section_title]['pending'].append(task)
 
         # 添加最后一个section
         if current_section:
@@ -310,10 +403,40 @@ class WorklogCollector:
             'file_path': str(file_path),
             'tasks': tasks,
             'section_tasks': section_tasks,
-            'sections': sections,
-            'raw_content': content
+            'sections': sections
         }
 
+    def _load_log_file(self, file_path: Path, file_date: Optional[date] = None) -> Optional[Tuple[Dict, str]]:
+        try:
+            content = self._read_log_file(file_path)
+            return self._parse_log_content(file_path, content, file_date), content
+        except Exception as e:
+            print(f"  ⚠️  解析文件失败 {file_path}: {e}")
+            return None
+
+    def _load_log_files(self, log_files: List[Tuple[Path, date]]) -> List[Tuple[Dict, str]]:
+        """
+        批量读取并解析日志文件，解析失败的文件会被跳过
+
+        每个文件只读取一次，解析结果与原始内容一起返回。
+        文件较多时使用线程池并发读取（I/O 密集，读文件时会释放 GIL），
+        结果顺序与 log_files 一致。
+
+        Args:
+            log_files: (日志文件路径, 日期) 列表
+
+        Returns:
+            (解析后的日志内容字典, 原始内容) 列表
+        """
+        if len(log_files) > 3:
+            paths, dates = zip(*log_files)
+            with ThreadPoolExecutor(max_workers=min(8, len(log_files))) as executor:
+                results = list(executor.map(self._load_log_file, paths, dates))
+        else:
+            results = [self._load_log_file(log_file, file_date) for log_file, file_date in log_files]
+
+        return [loaded for loaded in results if loaded is not None]
+
     def collect_logs_for_claude(self, days: int = 7) -> str:
         """
         收集并整理日志内容，为Claude分析准备输入
@@ -324,92 +447,76 @@ class WorklogCollector:
         Returns:
             格式化的日志内容，可直接发送给Claude
         """
-        # 计算工作周日期范围
+        buf = io.StringIO()
+        self._write_logs_for_claude(buf, days)
+        return buf.getvalue()
+
+    def _write_logs_for_claude(self, out: TextIO, days: int) -> Optional[List[Dict]]:
+        """
+        查找、读取并解析日志，同时将Claude输入格式的内容逐行写入输出流
+
+        遍历 → 解析 → 输出 一次完成，每个文件只读取一次。
+
+        Args:
+            out: 输出流（文件或 io.StringIO）
+            days: 天数
+
+        Returns:
+            解析后的日志列表；未找到日志文件时返回None
+        """
+        start_date, end_date, stats_range = self._compute_range(days)
+
         if days == 5:
-            today = datetime.now()
-            today_weekday = today.weekday()
-
-            if today_weekday in [0, 1, 2, 3]:  # 周一到周四
-                days_since_monday = today_weekday
-                last_monday = today - timedelta(days=days_since_monday + 7)
-            else:  # 周五到周日
-                days_since_monday = today_weekday
-                last_monday = today - timedelta(days=days_since_monday)
-
-            week_end = last_monday + timedelta(days=4)  # 周五
-            week_range = f"{last_monday.strftime('%Y-%m-%d')} 至 {week_end.strftime('%Y-%m-%d')}"
-            print(f"🔍 正在收集工作周日志：{week_range}")
-            stats_range = f"工作周：{week_range}"
+            print(f"🔍 正在收集工作周日志：{self._format_date_range(start_date, end_date)}")
         else:
             print(f"🔍 正在收集过去 {days} 天的工作日志...")
-            stats_range = f"过去 {days} 天"
 
-        log_files = self.find_recent_logs(days)
+        log_files = self._find_log_files(days)
 
         if not log_files:
             print("❌ 未找到工作日志文件")
-            return "未找到工作日志文件"
+            out.write("未找到工作日志文件")
+            return None
 
         print(f"✅ 找到 {len(log_files)} 个工作日志文件")
 
-        logs = []
-        for log_file in log_files:
-            try:
-                log_data = self.parse_log_file(log_file)
-                logs.append(log_data)
-            except Exception as e:
-                print(f"  ⚠️  解析文件失败 {log_file}: {e}")
+        loaded = self._load_log_files(log_files)
+        logs = [log for log, _ in loaded]
 
         # 生成Claude输入格式
-        claude_input = []
-        claude_input.append("=" * 80)
-        claude_input.append("工作日志内容汇总")
-        claude_input.append("=" * 80)
-        claude_input.append(f"统计时间：{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        claude_input.append(f"统计范围：{stats_range}")
-        claude_input.append(f"日志天数：{len(logs)} 天")
-        claude_input.append("")
-
-        for log in logs:
-            claude_input.append("=" * 80)
-            claude_input.append(f"日期：{log['date']}")
-            claude_input.append(f"文件：{log['file_path']}")
-            claude_input.append("=" * 80)
-            claude_input.append("")
-            claude_input.append(log['raw_content'])
-            claude_input.append("")
-            claude_input.append("")
-            claude_input.append("-" * 80)
-            claude_input.append("")
-
-        return '\n'.join(claude_input)
+        out.write("=" * 80 + "\n")
+        out.write("工作日志内容汇总\n")
+        out.write("=" * 80 + "\n")
+        out.write(f"统计时间：{self._now.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        out.write(f"统计范围：{stats_range}\n")
+        out.write(f"日志天数：{len(logs)} 天\n")
+
+        for log, content in loaded:
+            out.write("\n")
+            out.write("=" * 80 + "\n")
+            out.write(f"日期：{log['date']}\n")
+            out.write(f"文件：{log['file_path']}\n")
+            out.write("=" * 80 + "\n")
+            out.write("\n")
+            out.write(content)
+            out.write("\n\n\n")
+            out.write("-" * 80 + "\n")
+
+        return logs
 
     @staticmethod
     def _extract_log_dates(logs: List[Dict]) -> List[datetime]:
         dates: List[datetime] = []
         for log in logs:
             try:
-                dates.append(datetime.strptime(log.get('date', ''), '%Y-%m-%d'))
+                # fromisoformat 不经过 strptime 的正则匹配
+                dates.append(datetime.fromisoformat(log.get('date', '')))
             except Exception:
                 continue
         return sorted(dates)
 
     def _compute_stats_range_label(self, days: int) -> str:
-        if days == 5:
-            today = datetime.now()
-            today_weekday = today.weekday()
-
-            if today_weekday in [0, 1, 2, 3]:  # 周一到周四
-                days_since_monday = today_weekday
-                last_monday = today - timedelta(days=days_since_monday + 7)
-            else:  # 周五到周日
-                days_since_monday = today_weekday
-                last_monday = today - timedelta(days=days_since_monday)
-
-            week_end = last_monday + timedelta(days=4)  # 周五
-            return f"工作周：{last_monday.strftime('%Y-%m-%d')} 至 {week_end.strftime('%Y-%m-%d')}"
-
-        return f"过去 {days} 天"
+        return self._compute_range(days)[2]
 
     def generate_local_report_markdown(self, logs: List[Dict], days: int) -> str:
         stats_range = self._compute_stats_range_label(days)
@@ -513,10 +620,9 @@ class WorklogCollector:
             days: 天数
             output_file: 输出文件名
         """
-        content = self.collect_logs_for_claude(days)
-
+        # 直接写入文件，不在内存中拼出完整内容
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+            self._write_logs_for_claude(f, days)
 
         print(f"📄 原始日志内容已保存到：{output_file}")
         print(f"   可以将文件内容复制给Claude进行分析")
@@ -533,32 +639,23 @@ class WorklogCollector:
         Returns:
             Claude的分析结果
         """
+        # 仅在需要调用 Claude 时才导入（--no-claude 或作为库使用时用不到）
+        import subprocess
+        import tempfile
+
         print("🤖 正在调用Claude进行智能分析...")
 
         # 读取分析提示词
-        if prompt_file and os.path.exists(prompt_file):
-            try:
-                with open(prompt_file, 'r', encoding='utf-8') as f:
-                    analysis_prompt = f.read()
-            except Exception as e:
-                print(f"  ⚠️  读取提示词文件失败: {e}")
-                analysis_prompt = None
-        else:
-            # 使用默认提示词
-            analysis_prompt = self._get_default_analysis_prompt()
-
-        # 构建完整的提示词
-        full_prompt = f"""
-{analysis_prompt}
-
-{'=' * 80}
-工作日志内容：
-{'=' * 80}
-
-{log_content}
-
-请开始分析。
-"""
+        analysis_prompt = self._load_analysis_prompt(prompt_file)
+
+        # 完整的提示词分段写入，不再拼接成一个大字符串
+        prompt_parts = (
+            "\n",
+            analysis_prompt,
+            f"\n\n{'=' * 80}\n工作日志内容：\n{'=' * 80}\n\n",
+            log_content,
+            "\n\n请开始分析。\n",
+        )
 
         try:
             # 动态解析 claude 路径
@@ -570,22 +667,31 @@ class WorklogCollector:
             claude_bin = resolve_claude_path(_configured_path)
             print(f"  🔧 使用 claude: {claude_bin}")
 
-            cmd = [claude_bin, '-p', '--output-format', 'text', full_prompt]
-
-            # 调用Claude CLI
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5分钟超时
-            )
+            # 提示词先写入临时文件，再作为 stdin 交给 claude：
+            # 不走命令行参数（日志较多时会超过 ARG_MAX 限制），
+            # 也不会因管道写满而在超时控制之外阻塞
+            cmd = [claude_bin, '-p', '--output-format', 'text']
+
+            with tempfile.TemporaryFile() as prompt_fp:
+                for part in prompt_parts:
+                    prompt_fp.write(part.encode('utf-8'))
+                prompt_fp.seek(0)
+
+                # 调用Claude CLI
+                result = subprocess.run(
+                    cmd,
+                    stdin=prompt_fp,
+                    capture_output=True,
+                    timeout=300,  # 5分钟超时
+                )
 
             if result.returncode == 0:
                 print("✅ Claude分析完成！")
-                return result.stdout
+                return result.stdout.decode('utf-8', errors='replace')
             else:
-                print(f"❌ Claude调用失败: {result.stderr}")
-                return f"Claude调用失败: {result.stderr}"
+                error = result.stderr.decode('utf-8', errors='replace')
+                print(f"❌ Claude调用失败: {error}")
+                return f"Claude调用失败: {error}"
 
         except subprocess.TimeoutExpired:
             print("⏰ Claude分析超时（5分钟）")
@@ -594,6 +700,29 @@ class WorklogCollector:
             print(f"❌ 调用Claude时发生错误: {e}")
             return f"调用错误: {e}"
 
+    def _load_analysis_prompt(self, prompt_file: Optional[str]) -> str:
+        """
+        读取分析提示词
+
+        提示词文件不存在或读取失败时都使用默认提示词
+        （读取失败时不再把 None 拼进提示词发给 Claude）
+
+        Args:
+            prompt_file: 提示词文件路径
+
+        Returns:
+            分析提示词
+        """
+        if prompt_file and os.path.exists(prompt_file):
+            try:
+                with open(prompt_file, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except Exception as e:
+                print(f"  ⚠️  读取提示词文件失败: {e}")
+
+        # 使用默认提示词
+        return self._get_default_analysis_prompt()
+
     def _get_default_analysis_prompt(self) -> str:
         """
         获取默认的Claude分析提示词
@@ -747,29 +876,13 @@ class WorklogCollector:
         resolved_input_dir = self._resolve_output_path(base_dir, claude_input_dir)
         resolved_summary_dir = self._resolve_output_path(base_dir, worklog_summary_dir)
 
-        if days == 5:
-            # 计算工作周范围
-            today = datetime.now()
-            today_weekday = today.weekday()
-
-            if today_weekday in [0, 1, 2, 3]:  # 周一到周四
-                days_since_monday = today_weekday
-                last_monday = today - timedelta(days=days_since_monday + 7)
-            else:  # 周五到周日
-                days_since_monday = today_weekday
-                last_monday = today - timedelta(days=days_since_monday)
-
-            week_end = last_monday + timedelta(days=4)  # 周五
-
-            # 生成文件名：worklog_summary_YYYYMMDD_to_YYYYMMDD.txt
-            output_file = resolved_summary_dir / f"worklog_summary_{last_monday.strftime('%Y%m%d')}_to_{week_end.strftime('%Y%m%d')}.txt"
-            input_file = resolved_input_dir / f"claude_input_{last_monday.strftime('%Y%m%d')}_to_{week_end.strftime('%Y%m%d')}.txt"
-        else:
-            # 对于非5天的情况，使用日期范围
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days)
-            output_file = resolved_summary_dir / f"worklog_summary_{start_date.strftime('%Y%m%d')}_to_{end_date.strftime('%Y%m%d')}.txt"
-            input_file = resolved_input_dir / f"claude_input_{start_date.strftime('%Y%m%d')}_to_{end_date.strftime('%Y%m%d')}.txt"
+        start_date, end_date, _ = self._compute_range(days)
+        start_str = start_date.strftime('%Y%m%d')
+        end_str = end_date.strftime('%Y%m%d')
+
+        # 生成文件名：worklog_summary_YYYYMMDD_to_YYYYMMDD.txt
+        output_file = resolved_summary_dir / f"worklog_summary_{start_str}_to_{end_str}.txt"
+        input_file = resolved_input_dir / f"claude_input_{start_str}_to_{end_str}.txt"
 
         return str(output_file), str(input_file)
 
@@ -785,14 +898,18 @@ class WorklogCollector:
         """
         try:
             symlink_path = os.path.join(os.path.dirname(__file__), "latest_weekly_journal")
+            tmp_path = symlink_path + ".tmp"
 
-            # 删除旧的软链接（如果存在）
-            if os.path.exists(symlink_path):
-                os.remove(symlink_path)
+            # 清理上次残留的临时软链接
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
 
-            # 创建新的软链接（使用相对路径）
+            # 先创建临时软链接（使用相对路径），再原子替换旧的软链接
             rel_path = os.path.relpath(output_file, os.path.dirname(__file__))
-            os.symlink(rel_path, symlink_path)
+            os.symlink(rel_path, tmp_path)
+            os.replace(tmp_path, symlink_path)
 
             print(f"🔗 已更新软链接：latest_weekly_journal -> {os.path.basename(output_file)}")
             return True
@@ -802,7 +919,8 @@ class WorklogCollector:
 
     def generate_summary_with_claude(self, days: int = 5, use_claude: bool = True,
                                       prompt_file: str = "claude_analysis_prompt.md",
-                                      output_file: str = None) -> str:
+                                      output_file: str = None,
+                                      claude_input_file: str = None) -> str:
         """
         生成工作日志总结（可选自动调用Claude）
 
@@ -811,38 +929,26 @@ class WorklogCollector:
             use_claude: 是否使用Claude进行智能分析
             prompt_file: 分析提示词文件路径
             output_file: 输出文件路径，如果为None则自动生成
+            claude_input_file: 分析输入文件路径，如果为None则自动生成
 
         Returns:
             总结内容
         """
-        print(f"🔍 正在收集过去 {days} 天的工作日志...")
+        # 收集日志：一次遍历完成读取、解析与原始内容输出
+        buf = io.StringIO()
+        logs = self._write_logs_for_claude(buf, days)
 
-        # 收集日志
-        log_files = self.find_recent_logs(days)
-
-        if not log_files:
-            print("❌ 未找到工作日志文件")
+        if logs is None:
             return "未找到工作日志文件"
 
-        print(f"✅ 找到 {len(log_files)} 个工作日志文件")
-
-        logs = []
-        for log_file in log_files:
-            try:
-                log_data = self.parse_log_file(log_file)
-                logs.append(log_data)
-            except Exception as e:
-                print(f"  ⚠️  解析文件失败 {log_file}: {e}")
-
         local_report = self.generate_local_report_markdown(logs, days)
-        raw_log_content = self.collect_logs_for_claude(days)
+        raw_log_content = buf.getvalue()
 
-        # 自动生成文件名或使用提供的文件名
-        if output_file is None:
-            output_file, claude_input_file = self.generate_output_filename(days)
-        else:
-            # 如果提供了output_file，也生成对应的input_file
-            _, claude_input_file = self.generate_output_filename(days)
+        # 自动生成文件名或使用提供的文件名（调用方已生成时不再重复计算）
+        if output_file is None or claude_input_file is None:
+            default_output_file, default_input_file = self.generate_output_filename(days)
+            output_file = output_file or default_output_file
+            claude_input_file = claude_input_file or default_input_file
 
         # 保存分析输入（包含本地统计 + 原始日志，方便追溯/复现）
         with open(claude_input_file, 'w', encoding='utf-8') as f:
@@ -976,19 +1082,7 @@ def main():
 
     # 计算工作周范围
     if days == 5:
-        today = datetime.now()
-        today_weekday = today.weekday()
-
-        if today_weekday in [0, 1, 2, 3]:  # 周一到周四
-            days_since_monday = today_weekday
-            last_monday = today - timedelta(days=days_since_monday + 7)
-        else:  # 周五到周日
-            days_since_monday = today_weekday
-            last_monday = today - timedelta(days=days_since_monday)
-
-        week_end = last_monday + timedelta(days=4)  # 周五
-        week_range = f"{last_monday.strftime('%Y-%m-%d')} 至 {week_end.strftime('%Y-%m-%d')}"
-        print(f"📅 统计范围：{week_range}（完整工作周）")
+        print(f"📅 统计范围：{collector.date_range_text(days)}（完整工作周）")
     else:
         print(f"📅 统计范围：过去 {days} 天")
 
@@ -1008,7 +1102,8 @@ def main():
             days=days,
             use_claude=True,
             prompt_file=CLAUDE_PROMPT_FILE,
-            output_file=output_file
+            output_file=output_file,
+            claude_input_file=input_file
         )
 
         print("")
@@ -1026,7 +1121,8 @@ def main():
             days=days,
             use_claude=False,
             prompt_file=CLAUDE_PROMPT_FILE,
-            output_file=output_file
+            output_file=output_file,
+            claude_input_file=input_file
         )
 
         print("")